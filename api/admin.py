@@ -1,15 +1,150 @@
 from django.contrib import admin
-from .models import User, Animal, Order, OrderItem
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .models import User, Animal, ArchivedOrder, ArchivedOrderItem, Order, OrderItem, PriceStatistic
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the planner's row estimate for unfiltered changelists on large tables
+    instead of running an exact COUNT(*) on every page load.
+    """
+    EXACT_COUNT_THRESHOLD = 100000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if connection.vendor == 'postgresql' and query is not None and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.EXACT_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist defaults for tables with millions of rows.
+
+    Searches only use indexed `search_fields`, so they never fall back to a
+    LIKE '%term%' scan: plain fields match exactly (numeric fields only for
+    numeric terms), and '^field' is a case-sensitive prefix match, which a
+    Postgres `varchar_pattern_ops` index (Django adds one for indexed
+    CharFields) can serve. Autocomplete widgets use this search too.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    list_per_page = 50
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        q = Q()
+        for field in self.get_search_fields(request):
+            if field.startswith('^'):
+                q |= Q(**{f'{field[1:]}__startswith': search_term})
+            elif field in ('id', 'pk') or field.endswith('__id'):
+                if search_term.isdigit():
+                    q |= Q(**{field: int(search_term)})
+            else:
+                q |= Q(**{field: search_term})
+        return (queryset.filter(q) if q else queryset.none()), False
+
 
 class OrderItemInline(admin.TabularInline):
+    """
+    Items are shown read-only: a raw-ID or select widget would load each
+    animal (and its farmer) separately, and editing items here would bypass
+    the stock bookkeeping done when orders are placed.
+    """
     model = OrderItem
-    extra = 0 
+    extra = 0
+    readonly_fields = ('animal', 'quantity', 'unit_price')
+    can_delete = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('animal__farmer')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ('id', 'buyer', 'status', 'created_at')
     list_filter = ('status', 'created_at')
+    list_select_related = ('buyer',)
+    search_fields = ('id', 'buyer__username')
+    autocomplete_fields = ('buyer',)
     inlines = [OrderItemInline]
 
-admin.site.register(User)
-admin.site.register(Animal)
\ No newline at end of file
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    readonly_fields = ('animal', 'quantity', 'unit_price')
+    can_delete = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('animal__farmer')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin):
+    list_display = ('id', 'buyer', 'status', 'created_at', 'archived_at')
+    list_filter = ('status',)
+    list_select_related = ('buyer',)
+    search_fields = ('id', 'buyer__username')
+    readonly_fields = ('id', 'buyer', 'status', 'created_at', 'updated_at', 'archived_at')
+    inlines = [ArchivedOrderItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(User)
+class UserAdmin(LargeTableAdmin):
+    list_display = ('id', 'username', 'email', 'user_type', 'location', 'date_joined')
+    list_filter = ('user_type',)
+    search_fields = ('id', '^username')
+    filter_horizontal = ('groups', 'user_permissions')
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if db_field.name == 'user_permissions':
+            # Permission.__str__ includes its content type.
+            kwargs['queryset'] = db_field.remote_field.model.objects.select_related('content_type')
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+@admin.register(Animal)
+class AnimalAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'animal_type', 'breed', 'farmer', 'price', 'quantity', 'is_sold', 'created_at')
+    list_filter = ('animal_type', 'is_sold')
+    list_select_related = ('farmer',)
+    search_fields = ('id', 'farmer__username')
+    autocomplete_fields = ('farmer',)
+
+
+@admin.register(PriceStatistic)
+class PriceStatisticAdmin(LargeTableAdmin):
+    list_display = ('animal_type', 'breed', 'week', 'listing_median', 'sold_median', 'sold_count', 'refreshed_at')
+    list_filter = ('animal_type',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .market import suspend_tracking
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+ARCHIVABLE_STATUSES = [Order.OrderStatus.DELIVERED, Order.OrderStatus.REJECTED]
+
+
+def archive_orders(older_than_days, batch_size=1000, max_batches=None):
+    """
+    Moves finished orders created more than `older_than_days` ago, with their
+    items, into the archive tables.
+
+    Each batch is copied and deleted in its own short transaction, so the hot
+    table is never locked for long. Yields the number of orders moved per batch.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            orders = list(
+                Order.objects.select_for_update(skip_locked=True)
+                .filter(status__in=ARCHIVABLE_STATUSES, created_at__lt=cutoff)
+                .order_by('id')[:batch_size]
+            )
+            if not orders:
+                return
+            order_ids = [order.id for order in orders]
+            items = list(OrderItem.objects.filter(order_id__in=order_ids))
+
+            ArchivedOrder.objects.bulk_create(
+                ArchivedOrder(
+                    id=order.id, buyer_id=order.buyer_id, status=order.status,
+                    created_at=order.created_at, updated_at=order.updated_at,
+                ) for order in orders
+            )
+            ArchivedOrderItem.objects.bulk_create(
+                ArchivedOrderItem(
+                    id=item.id, order_id=item.order_id, animal_id=item.animal_id,
+                    quantity=item.quantity, unit_price=item.unit_price,
+                ) for item in items
+            )
+            # Archived items still feed the sold-price statistics, so moving them
+            # does not dirty any bucket.
+            with suspend_tracking():
+                OrderItem.objects.filter(order_id__in=order_ids).delete()
+                Order.objects.filter(id__in=order_ids).delete()
+        batches += 1
+        yield len(orders)
@@ -0,0 +1,31 @@
+"""
+Deferred drf_yasg annotations.
+
+`swagger_schema` records a factory instead of calling drf_yasg's
+`swagger_auto_schema` at import time; the factories are only evaluated (and
+drf_yasg imported) when the API docs are generated.
+"""
+
+_pending = []
+
+
+def swagger_schema(factory=None):
+    """
+    Decorator for view methods. `factory(openapi)` returns the keyword
+    arguments for `swagger_auto_schema`, e.g.
+
+        @swagger_schema(lambda openapi: {'operation_description': "..."})
+    """
+    def decorator(view_method):
+        _pending.append((view_method, factory))
+        return view_method
+    return decorator
+
+
+def apply_schemas():
+    from drf_yasg import openapi
+    from drf_yasg.utils import swagger_auto_schema
+
+    while _pending:
+        view_method, factory = _pending.pop()
+        swagger_auto_schema(**(factory(openapi) if factory else {}))(view_method)
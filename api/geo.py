@@ -0,0 +1,84 @@
+import math
+
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0
+
+# Grid bucket size in degrees (~28 km of latitude). Farmer profiles store the
+# bucket they fall in so radius queries can narrow to a handful of indexed
+# cells before computing any exact distances.
+GEO_CELL_DEGREES = 0.25
+GEO_CELL_COLUMNS = int(360 / GEO_CELL_DEGREES)
+MAX_SEARCH_RADIUS_KM = 200
+
+
+def geo_cell_for(latitude, longitude):
+    """Returns the grid bucket id for a coordinate, or None if either is missing."""
+    if latitude is None or longitude is None:
+        return None
+    row = int(math.floor((float(latitude) + 90) / GEO_CELL_DEGREES))
+    col = int(math.floor((float(longitude) + 180) / GEO_CELL_DEGREES)) % GEO_CELL_COLUMNS
+    return row * GEO_CELL_COLUMNS + col
+
+
+def geo_cells_within(latitude, longitude, radius_km):
+    """
+    Returns every grid bucket id overlapping the bounding box of a circle.
+    """
+    lat_delta = radius_km / 111.0
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    lng_delta = min(radius_km / (111.0 * cos_lat), 180.0)
+
+    min_row = int(math.floor((max(latitude - lat_delta, -90) + 90) / GEO_CELL_DEGREES))
+    max_row = int(math.floor((min(latitude + lat_delta, 90) + 90) / GEO_CELL_DEGREES))
+    min_col = int(math.floor((longitude - lng_delta + 180) / GEO_CELL_DEGREES))
+    max_col = int(math.floor((longitude + lng_delta + 180) / GEO_CELL_DEGREES))
+
+    cells = set()
+    for row in range(min_row, max_row + 1):
+        for col in range(min_col, max_col + 1):
+            cells.add(row * GEO_CELL_COLUMNS + col % GEO_CELL_COLUMNS)
+    return sorted(cells)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres between two coordinates."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def distance_expression(latitude, longitude, lat_field, lng_field):
+    """
+    Database-side haversine distance (km) from a fixed point to the given fields.
+    """
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    a = (
+        Power(Sin((Radians(F(lat_field)) - lat) / 2), 2)
+        + math.cos(lat) * Cos(Radians(F(lat_field))) * Power(Sin((Radians(F(lng_field)) - lng) / 2), 2)
+    )
+    return ASin(Sqrt(a), output_field=FloatField()) * (2 * EARTH_RADIUS_KM)
+
+
+def filter_within_radius(queryset, latitude, longitude, radius_km, prefix=''):
+    """
+    Restricts `queryset` to rows within `radius_km` of the point, nearest first.
+
+    `prefix` is the lookup path to the model carrying the coordinates, e.g.
+    'farmer__' for animals. Rows are first narrowed by grid bucket and bounding
+    box (both indexed), so the exact distance is only computed for candidates.
+    Raises ValueError if `radius_km` exceeds MAX_SEARCH_RADIUS_KM.
+    """
+    if radius_km > MAX_SEARCH_RADIUS_KM:
+        raise ValueError(f"radius_km may not exceed {MAX_SEARCH_RADIUS_KM}.")
+    lat_delta = radius_km / 111.0
+    queryset = queryset.filter(**{
+        f'{prefix}geo_cell__in': geo_cells_within(latitude, longitude, radius_km),
+        f'{prefix}latitude__gte': latitude - lat_delta,
+        f'{prefix}latitude__lte': latitude + lat_delta,
+    })
+    return queryset.annotate(
+        distance_km=distance_expression(latitude, longitude, f'{prefix}latitude', f'{prefix}longitude')
+    ).filter(distance_km__lte=radius_km).order_by('distance_km')
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Moves delivered and rejected orders past a cutoff into the archive tables, in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=90)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help="Stop after this many batches (default: until done).")
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        total = 0
+        for moved in archive_orders(options['older_than_days'], options['batch_size'], options['max_batches']):
+            total += moved
+            self.stdout.write(f"Archived {moved} orders ({total} so far)")
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} orders."))
@@ -0,0 +1,69 @@
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Checks admin changelists and change forms against a fixed query and latency budget."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-queries', type=int, default=12)
+        parser.add_argument('--max-ms', type=float, default=500.0)
+
+    def handle(self, *args, **options):
+        # The temporary superuser is created inside a transaction that is rolled back.
+        self.failures = []
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        if self.failures:
+            raise CommandError("Over budget: " + ", ".join(self.failures))
+
+    def _run(self, options):
+        client = Client()
+        client.force_login(User.objects.create_superuser('bench_admin', 'bench@example.com', 'bench'))
+
+        for model in admin.site._registry:
+            if model._meta.app_label != 'api':
+                continue
+            info = (model._meta.app_label, model._meta.model_name)
+            urls = [reverse('admin:%s_%s_changelist' % info)]
+            # Pick the row with the most inline items, where per-row queries would show up.
+            queryset = model._default_manager.all()
+            if any(rel.name == 'items' for rel in model._meta.related_objects):
+                queryset = queryset.annotate(item_count=Count('items')).order_by('-item_count', '-pk')
+            else:
+                queryset = queryset.order_by('-pk')
+            obj = queryset.first()
+            if obj is not None:
+                urls.append(reverse('admin:%s_%s_change' % info, args=[obj.pk]))
+            for url in urls:
+                self._measure(client, url, options)
+
+    def _measure(self, client, url, options):
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+
+        over = len(queries) > options['max_queries'] or elapsed > options['max_ms']
+        if over:
+            self.failures.append(url)
+        line = f"{url:<45} {response.status_code} {len(queries):3d} queries {elapsed:8.1f}ms"
+        self.stdout.write(self.style.ERROR(line) if over else line)
@@ -0,0 +1,90 @@
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from farmart_project import docs
+
+BOOT_SCRIPT = """
+import os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'farmart_project.settings')
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - started, 'drf_yasg.generators' in sys.modules)
+"""
+
+
+class Command(BaseCommand):
+    help = "Measures worker boot time and API docs response latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--boots', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help="Docs URL to time; repeatable. Defaults to /openapi.json, /swagger/ and /redoc/.",
+        )
+
+    def handle(self, *args, **options):
+        boot_times = []
+        for _ in range(options['boots']):
+            output = subprocess.run(
+                [sys.executable, '-c', BOOT_SCRIPT], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.split()
+            boot_times.append(float(output[0]))
+            yasg_loaded = output[1] == 'True'
+        self.stdout.write(
+            f"worker boot: median {statistics.median(boot_times) * 1000:.0f}ms "
+            f"(drf_yasg schema tooling loaded at boot: {yasg_loaded})"
+        )
+
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            self._measure_docs(options)
+
+        if not docs.SCHEMA_FILE.exists():
+            self.stdout.write("No prebuilt schema found; the first /openapi.json hit generated it in-process.")
+
+    def _measure_docs(self, options):
+        from drf_yasg.generators import OpenAPISchemaGenerator
+
+        generations = []
+        get_schema = OpenAPISchemaGenerator.get_schema
+
+        def counting_get_schema(generator, *args, **kwargs):
+            generations.append(1)
+            return get_schema(generator, *args, **kwargs)
+
+        OpenAPISchemaGenerator.get_schema = counting_get_schema
+        try:
+            for url in options['urls'] or ('/openapi.json', '/swagger/', '/redoc/'):
+                self._measure_url(url, options['requests'], generations)
+        finally:
+            OpenAPISchemaGenerator.get_schema = get_schema
+
+    def _get(self, client, url):
+        # Every request comes from a "new visitor" with its own cookie, as
+        # browsers send; per-cookie caches would miss on each of them.
+        client.cookies['csrftoken'] = uuid.uuid4().hex
+        started = time.perf_counter()
+        response = client.get(url)
+        return response, time.perf_counter() - started
+
+    def _measure_url(self, url, requests, generations):
+        client = Client(HTTP_ACCEPT_ENCODING='gzip')
+        before = len(generations)
+        response, first = self._get(client, url)
+        latencies = [self._get(client, url)[1] for _ in range(requests)]
+        self.stdout.write(
+            f"{url:>14}: first {first * 1000:7.1f}ms, then median {statistics.median(latencies) * 1000:6.2f}ms "
+            f"({response.status_code}, {len(response.content)} bytes, "
+            f"{len(generations) - before} schema generations in {requests + 1} requests)"
+        )
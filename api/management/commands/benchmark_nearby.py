@@ -0,0 +1,94 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api import geo
+from api.models import Animal, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the grid-bucketed radius query against a naive full-scan distance sort."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farmers', type=int, default=20000)
+        parser.add_argument('--listings', type=int, default=300000)
+        parser.add_argument('--radius', type=float, default=25.0, help="Search radius in km.")
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Everything is generated inside a transaction that is rolled back, so the
+        # command is safe to run against a development database.
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _run(self, options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"Seeding {options['farmers']} farmers and {options['listings']} listings...")
+
+        # Roughly the bounding box of Kenya.
+        farmers = []
+        for i in range(options['farmers']):
+            latitude = rng.uniform(-4.7, 4.6)
+            longitude = rng.uniform(33.9, 41.9)
+            farmers.append(User(
+                username=f'bench_farmer_{i}',
+                user_type=User.Types.FARMER,
+                location='bench',
+                latitude=latitude,
+                longitude=longitude,
+                geo_cell=geo.geo_cell_for(latitude, longitude),
+            ))
+        farmers = User.objects.bulk_create(farmers, batch_size=5000)
+
+        animal_types = [choice for choice, _ in Animal.AnimalTypes.choices]
+        Animal.objects.bulk_create((
+            Animal(
+                farmer=rng.choice(farmers),
+                name=f'bench_animal_{i}',
+                animal_type=rng.choice(animal_types),
+                breed='bench',
+                age=rng.randint(1, 120),
+                price=rng.randint(1000, 200000),
+                description='',
+            ) for i in range(options['listings'])
+        ), batch_size=5000)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {User._meta.db_table}')
+                cursor.execute(f'ANALYZE {Animal._meta.db_table}')
+
+        points = [(rng.uniform(-4.7, 4.6), rng.uniform(33.9, 41.9)) for _ in range(options['runs'])]
+        radius = options['radius']
+        listings = Animal.objects.filter(is_sold=False, quantity__gt=0)
+
+        def naive(latitude, longitude):
+            return list(
+                listings.annotate(
+                    distance_km=geo.distance_expression(latitude, longitude, 'farmer__latitude', 'farmer__longitude')
+                ).filter(distance_km__lte=radius).order_by('distance_km').values_list('id', flat=True)
+            )
+
+        def bucketed(latitude, longitude):
+            return list(
+                geo.filter_within_radius(listings, latitude, longitude, radius, prefix='farmer__')
+                .values_list('id', flat=True)
+            )
+
+        for label, query in (('naive full scan', naive), ('grid buckets', bucketed)):
+            query(*points[0])
+            started = time.perf_counter()
+            matched = sum(len(query(*point)) for point in points)
+            elapsed = (time.perf_counter() - started) / len(points)
+            self.stdout.write(f"{label:>16}: {elapsed * 1000:8.2f} ms/query, {matched / len(points):.0f} avg matches")
@@ -0,0 +1,109 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.market import SOLD_STATUSES, refresh_price_statistics
+from api.models import Animal, Order, OrderItem, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmarks full and incremental price statistics refreshes on generated order data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=200000)
+        parser.add_argument('--order-items', type=int, default=2000000)
+        parser.add_argument('--new-order-items', type=int, default=5000)
+        parser.add_argument('--edited-listings', type=int, default=100)
+        parser.add_argument('--weeks', type=int, default=104)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Everything is generated inside a transaction that is rolled back, so the
+        # command is safe to run against a development database.
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+    def _timed(self, label, func):
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"{label:>22}: {time.perf_counter() - started:8.2f}s")
+        return result
+
+    def _seed_orders(self, rng, buyers, animals, count, weeks):
+        now = timezone.now()
+        statuses = SOLD_STATUSES + [Order.OrderStatus.PENDING, Order.OrderStatus.REJECTED]
+        created = 0
+        while created < count:
+            batch = min(5000, count - created)
+            orders = Order.objects.bulk_create(
+                Order(buyer=rng.choice(buyers), status=rng.choice(statuses)) for _ in range(batch)
+            )
+            # auto_now_add ignores explicit values, so spread orders over time afterwards.
+            for order in orders:
+                order.created_at = now - timedelta(days=rng.uniform(0, weeks * 7))
+            Order.objects.bulk_update(orders, ['created_at'])
+            items = []
+            for order in orders:
+                animal = rng.choice(animals)
+                items.append(OrderItem(order=order, animal=animal, quantity=rng.randint(1, 3), unit_price=animal.price))
+            OrderItem.objects.bulk_create(items)
+            created += batch
+
+    def _run(self, options):
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"Seeding {options['listings']} listings and {options['order_items']} order items...")
+
+        farmers = User.objects.bulk_create(
+            User(username=f'bench_farmer_{i}', user_type=User.Types.FARMER, location='bench') for i in range(500)
+        )
+        buyers = User.objects.bulk_create(
+            User(username=f'bench_buyer_{i}', user_type=User.Types.BUYER, location='bench') for i in range(2000)
+        )
+        animal_types = [choice for choice, _ in Animal.AnimalTypes.choices]
+        breeds = [f'breed_{i}' for i in range(8)]
+        animals = Animal.objects.bulk_create((
+            Animal(
+                farmer=rng.choice(farmers),
+                name=f'bench_animal_{i}',
+                animal_type=rng.choice(animal_types),
+                breed=rng.choice(breeds),
+                age=rng.randint(1, 120),
+                price=rng.randint(1000, 200000),
+                description='',
+            ) for i in range(options['listings'])
+        ), batch_size=5000)
+        now = timezone.now()
+        for animal in animals:
+            animal.created_at = now - timedelta(days=rng.uniform(0, options['weeks'] * 7))
+        Animal.objects.bulk_update(animals, ['created_at'], batch_size=5000)
+        self._seed_orders(rng, buyers, animals, options['order_items'], options['weeks'])
+
+        # Fresh tables have no planner statistics; without them SQLite also
+        # prefers the low-selectivity animal_type index over created_at.
+        with connection.cursor() as cursor:
+            for model in (Animal, Order, OrderItem):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+        rows = self._timed('full refresh', lambda: refresh_price_statistics(full=True))
+        self.stdout.write(f"{'summary rows':>22}: {rows}")
+
+        since = timezone.now()
+        self._seed_orders(rng, buyers, animals, options['new_order_items'], 1)
+        # Some farmers edit their listings between refreshes too.
+        edited = [animal.pk for animal in rng.sample(animals, options['edited_listings'])]
+        Animal.objects.filter(pk__in=edited).update(price=F('price') + 100, updated_at=timezone.now())
+        rows = self._timed('incremental refresh', lambda: refresh_price_statistics(since=since))
+        self.stdout.write(f"{'rows rewritten':>22}: {rows}")
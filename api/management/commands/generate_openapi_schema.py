@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from farmart_project import docs
+
+
+class Command(BaseCommand):
+    help = "Writes the OpenAPI schema served at /openapi.json. Run at build time so workers never introspect the API."
+
+    def handle(self, *args, **options):
+        docs.SCHEMA_FILE.parent.mkdir(parents=True, exist_ok=True)
+        docs.SCHEMA_FILE.write_bytes(docs.generate_schema())
+        self.stdout.write(self.style.SUCCESS(f"Wrote {docs.SCHEMA_FILE}"))
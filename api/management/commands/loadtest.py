@@ -0,0 +1,54 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent POST requests at a running server and reports status codes and latency, "
+        "e.g. to check throttling on /api/make-payment/ or /api/register/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--token', help="JWT access token sent as a Bearer header.")
+        parser.add_argument('--data', action='append', default=[], help="Form field as key=value; repeatable.")
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        data = dict(field.split('=', 1) for field in options['data'])
+        session = requests.Session()
+
+        def send(_):
+            started = time.perf_counter()
+            try:
+                response = session.post(options['url'], data=data, headers=headers, timeout=30)
+                code = response.status_code
+                retry_after = response.headers.get('Retry-After')
+            except requests.exceptions.RequestException as e:
+                code, retry_after = type(e).__name__, None
+            return code, retry_after, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, _, latency in results)
+        codes = Counter(code for code, _, _ in results)
+        missing_retry_after = sum(1 for code, retry_after, _ in results if code in (429, 503) and not retry_after)
+
+        self.stdout.write(f"{len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s)")
+        for code, count in sorted(codes.items(), key=lambda item: str(item[0])):
+            self.stdout.write(f"  {code}: {count}")
+        self.stdout.write(
+            f"  latency p50={latencies[len(latencies) // 2] * 1000:.0f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.0f}ms max={latencies[-1] * 1000:.0f}ms"
+        )
+        if missing_retry_after:
+            self.stdout.write(self.style.WARNING(f"  {missing_retry_after} throttled responses lacked Retry-After"))
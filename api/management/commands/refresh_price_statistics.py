@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.market import refresh_price_statistics
+
+
+class Command(BaseCommand):
+    help = "Refreshes the weekly price statistics summary. Intended to run periodically (e.g. from cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild every bucket instead of only changed ones.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh_price_statistics(full=options['full'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {written} price statistic rows in {elapsed:.2f}s."))
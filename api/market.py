@@ -0,0 +1,239 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import DateField, Max, Q, Value
+from django.db.models.functions import Coalesce, TruncWeek
+from django.utils import timezone
+
+from .models import Animal, ArchivedOrderItem, Order, OrderItem, PriceStatistic, PriceStatisticDirtyBucket
+
+SOLD_STATUSES = [Order.OrderStatus.CONFIRMED, Order.OrderStatus.PAID, Order.OrderStatus.DELIVERED]
+
+# Changes that commit while a refresh is running can carry timestamps slightly
+# older than the rows it writes, so incremental runs re-read a short overlap.
+REFRESH_OVERLAP = timedelta(minutes=10)
+BUCKET_BATCH_SIZE = 500
+WRITE_BATCH_SIZE = 1000
+
+STAT_FIELDS = [
+    'listing_count', 'listing_min', 'listing_median', 'listing_p90',
+    'sold_count', 'sold_min', 'sold_median', 'sold_p90', 'refreshed_at',
+]
+
+_tracking_suspended = ContextVar('price_tracking_suspended', default=False)
+
+
+def week_of(moment):
+    """Monday (local time) of the week `moment` falls in, matching TruncWeek."""
+    local = timezone.localtime(moment)
+    return (local - timedelta(days=local.weekday())).date()
+
+
+def mark_buckets_dirty(buckets):
+    """Queues (type, breed, week) buckets for the next incremental refresh."""
+    PriceStatisticDirtyBucket.objects.bulk_create(
+        [PriceStatisticDirtyBucket(animal_type=t, breed=b, week=w) for t, b, w in set(buckets)],
+        ignore_conflicts=True,
+    )
+
+
+@contextmanager
+def suspend_tracking():
+    """
+    Skips dirty-bucket bookkeeping for deletes that do not change any price,
+    such as moving orders into the archive.
+    """
+    token = _tracking_suspended.set(True)
+    try:
+        yield
+    finally:
+        _tracking_suspended.reset(token)
+
+
+def tracking_suspended():
+    return _tracking_suspended.get()
+
+
+def _nth(weighted, index):
+    """The value at `index` once sorted (value, count) pairs are expanded."""
+    for value, count in weighted:
+        if index < count:
+            return value
+        index -= count
+    return weighted[-1][0]
+
+
+def _percentile(weighted, total, fraction):
+    """Linearly interpolated percentile of sorted (value, count) pairs."""
+    position = (total - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, total - 1)
+    weight = Decimal(str(position - lower))
+    low, high = _nth(weighted, lower), _nth(weighted, upper)
+    return (low + (high - low) * weight).quantize(Decimal('0.01'))
+
+
+def _summarise(weighted):
+    total = sum(count for _, count in weighted)
+    if not total:
+        return 0, None, None, None
+    return total, weighted[0][0], _percentile(weighted, total, 0.5), _percentile(weighted, total, 0.9)
+
+
+def _week_q(week, pairs, type_field, breed_field, date_field):
+    """
+    Matches the rows of one week's (type, breed) buckets: an indexable date
+    range, then a short OR over that week's pairs.
+    """
+    start = timezone.make_aware(datetime.combine(week, time.min))
+    q = Q()
+    for animal_type, breed in pairs:
+        q |= Q(**{type_field: animal_type, breed_field: breed})
+    return q & Q(**{f'{date_field}__gte': start, f'{date_field}__lt': start + timedelta(days=7)})
+
+
+def _grouped_prices(querysets, type_field, breed_field, date_field, price_field, count_field=None, week=None):
+    """
+    Streams {(type, breed, week): sorted (price, count) pairs} one bucket at a
+    time. Each row counts once unless `count_field` gives its multiplicity.
+    """
+    fields = (type_field, breed_field, 'week', price_field) + ((count_field,) if count_field else ())
+    # Callers reading a single week pass it in rather than truncating every row.
+    week_expression = TruncWeek(date_field) if week is None else Value(week, output_field=DateField())
+    rows = [queryset.annotate(week=week_expression).values_list(*fields) for queryset in querysets]
+    rows = rows[0].union(*rows[1:], all=True) if len(rows) > 1 else rows[0]
+    rows = rows.order_by(*fields[:4]).iterator(chunk_size=5000)
+    for (animal_type, breed, week), group in groupby(rows, key=lambda row: row[:3]):
+        week = week.date() if hasattr(week, 'date') else week
+        yield (animal_type, breed, week), [(row[3], row[4] if count_field else 1) for row in group]
+
+
+def _listing_prices(q=None, week=None):
+    queryset = Animal.objects.all() if q is None else Animal.objects.filter(q)
+    return _grouped_prices([queryset], 'animal_type', 'breed', 'created_at', 'price', week=week)
+
+
+def _sold_prices(q=None, week=None):
+    """
+    Per-unit prices of sold items, hot and archived, counted once per unit.
+    Items ordered before unit prices were recorded use the listing's price.
+    """
+    querysets = [
+        OrderItem.objects.filter(order__status__in=SOLD_STATUSES),
+        ArchivedOrderItem.objects.filter(order__status__in=SOLD_STATUSES),
+    ]
+    if q is not None:
+        querysets = [queryset.filter(q) for queryset in querysets]
+    querysets = [queryset.annotate(sold_price=Coalesce('unit_price', 'animal__price')) for queryset in querysets]
+    return _grouped_prices(
+        querysets, 'animal__animal_type', 'animal__breed', 'order__created_at', 'sold_price', 'quantity', week
+    )
+
+
+def _item_buckets(queryset):
+    return queryset.annotate(
+        week=TruncWeek('order__created_at')
+    ).values_list('animal__animal_type', 'animal__breed', 'week').distinct()
+
+
+def _touched_buckets(since):
+    """
+    (type, breed, week) buckets whose inputs changed after `since`.
+
+    Each query is driven by one table's `updated_at` index; an OR across the
+    joined tables could use neither and would scan every order item.
+    """
+    changed_animals = Animal.objects.filter(updated_at__gte=since)
+    queries = [
+        changed_animals.annotate(week=TruncWeek('created_at')).values_list('animal_type', 'breed', 'week').distinct(),
+        _item_buckets(OrderItem.objects.filter(order__in=Order.objects.filter(updated_at__gte=since))),
+        _item_buckets(OrderItem.objects.filter(animal__in=changed_animals)),
+        _item_buckets(ArchivedOrderItem.objects.filter(animal__in=changed_animals)),
+    ]
+    buckets = set()
+    for query in queries:
+        for animal_type, breed, week in query:
+            buckets.add((animal_type, breed, week.date() if hasattr(week, 'date') else week))
+    return buckets
+
+
+def _write(statistics, buckets):
+    """Upserts computed rows and drops buckets that no longer have any prices."""
+    rows = [
+        PriceStatistic(
+            animal_type=animal_type, breed=breed, week=week,
+            listing_count=listing[0], listing_min=listing[1], listing_median=listing[2], listing_p90=listing[3],
+            sold_count=sold[0], sold_min=sold[1], sold_median=sold[2], sold_p90=sold[3],
+        )
+        for (animal_type, breed, week), (listing, sold) in statistics.items()
+    ]
+    PriceStatistic.objects.bulk_create(
+        rows,
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['animal_type', 'breed', 'week'],
+        update_fields=STAT_FIELDS,
+    )
+    empty = [bucket for bucket in buckets if bucket not in statistics]
+    for start in range(0, len(empty), BUCKET_BATCH_SIZE):
+        q = Q()
+        for animal_type, breed, week in empty[start:start + BUCKET_BATCH_SIZE]:
+            q |= Q(animal_type=animal_type, breed=breed, week=week)
+        PriceStatistic.objects.filter(q).delete()
+    return len(rows)
+
+
+def _compute(q_listing=None, q_sold=None, week=None):
+    statistics = {}
+    for bucket, prices in _listing_prices(q_listing, week):
+        statistics[bucket] = [_summarise(prices), _summarise([])]
+    for bucket, prices in _sold_prices(q_sold, week):
+        statistics.setdefault(bucket, [_summarise([]), None])[1] = _summarise(prices)
+    return statistics
+
+
+def refresh_price_statistics(full=False, since=None):
+    """
+    Recomputes the PriceStatistic summary table.
+
+    Incremental runs only rebuild the buckets whose listings or orders changed
+    since the last refresh, plus buckets queued as dirty by `api.signals`;
+    `full` rebuilds every bucket in a single pass. Returns the number of rows
+    written.
+    """
+    if since is None and not full:
+        last_refresh = PriceStatistic.objects.aggregate(last=Max('refreshed_at'))['last']
+        if last_refresh is None:
+            full = True
+        else:
+            since = last_refresh - REFRESH_OVERLAP
+
+    if full:
+        started = timezone.now()
+        with transaction.atomic():
+            written = _write(_compute(), [])
+            PriceStatistic.objects.filter(refreshed_at__lt=started).delete()
+            PriceStatisticDirtyBucket.objects.all().delete()
+        return written
+
+    written = 0
+    dirty = list(PriceStatisticDirtyBucket.objects.values_list('id', 'animal_type', 'breed', 'week'))
+    buckets = sorted(_touched_buckets(since) | {row[1:] for row in dirty}, key=lambda bucket: bucket[2])
+    # One week at a time, so each query reads a single week's rows through the date indexes.
+    for week, group in groupby(buckets, key=lambda bucket: bucket[2]):
+        batch = list(group)
+        pairs = [bucket[:2] for bucket in batch]
+        with transaction.atomic():
+            statistics = _compute(
+                _week_q(week, pairs, 'animal_type', 'breed', 'created_at'),
+                _week_q(week, pairs, 'animal__animal_type', 'animal__breed', 'order__created_at'),
+                week,
+            )
+            written += _write(statistics, batch)
+    # Only clear the entries read above; buckets dirtied meanwhile wait for the next run.
+    PriceStatisticDirtyBucket.objects.filter(id__in=[row[0] for row in dirty]).delete()
+    return written
@@ -2,9 +2,11 @@ from django.db import models
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.core.validators import RegexValidator
+from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from cloudinary.models import CloudinaryField
 
+from .geo import geo_cell_for
+
 class User(AbstractUser):
     """Custom User Model with Buyer/Farmer roles."""
     class Types(models.TextChoices):
@@ -23,9 +25,25 @@ class User(AbstractUser):
         ]
     )
     location = models.CharField(max_length=255)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    geo_cell = models.IntegerField(null=True, blank=True, editable=False)
     groups = models.ManyToManyField('auth.Group', related_name='api_user_set', blank=True)
     user_permissions = models.ManyToManyField('auth.Permission', related_name='api_user_set', blank=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['geo_cell', 'latitude'], name='user_geo_cell_lat_idx'),
+            models.Index(fields=['user_type'], name='user_type_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.geo_cell = geo_cell_for(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
 
@@ -55,7 +73,13 @@ class Animal(models.Model):
     is_sold = models.BooleanField(default=False)
     quantity = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['animal_type', 'is_sold'], name='animal_type_sold_idx'),
+            models.Index(fields=['created_at'], name='animal_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_animal_type_display()}) by {self.farmer.username}"
@@ -78,6 +102,13 @@ class Order(models.Model):
     )
     status = models.CharField(max_length=20, choices=OrderStatus.choices, default=OrderStatus.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.id} by {self.buyer.username} - {self.get_status_display()}"
@@ -87,6 +118,10 @@ class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     animal = models.ForeignKey(Animal, on_delete=models.PROTECT) 
     quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True,
+        help_text="The listing's price when the order was placed; empty for items ordered before it was recorded"
+    )
 
     class Meta:
         unique_together = ('order', 'animal')
@@ -96,4 +131,84 @@ class OrderItem(models.Model):
             raise ValidationError("A farmer cannot order their own animal.")
 
     def __str__(self):
-        return f"{self.quantity} of {self.animal.name} in Order {self.order.id}"
\ No newline at end of file
+        return f"{self.quantity} of {self.animal.name} in Order {self.order_id}"
+
+
+class PriceStatistic(models.Model):
+    """Weekly listing and sold price summary per animal type and breed."""
+    animal_type = models.CharField(max_length=50, choices=Animal.AnimalTypes.choices)
+    breed = models.CharField(max_length=100)
+    week = models.DateField(help_text="Monday of the week the prices fall in")
+
+    listing_count = models.PositiveIntegerField(default=0)
+    listing_min = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    listing_median = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    listing_p90 = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    sold_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Units sold; sold prices are per-unit order prices weighted by quantity, falling back to "
+                  "the current listing price for items ordered before unit prices were recorded"
+    )
+    sold_min = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    sold_median = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    sold_p90 = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('animal_type', 'breed', 'week')
+        indexes = [
+            models.Index(fields=['animal_type', 'week'], name='pricestat_type_week_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_animal_type_display()} / {self.breed} - week of {self.week}"
+
+
+class PriceStatisticDirtyBucket(models.Model):
+    """
+    A PriceStatistic bucket that lost rows (edited type/breed, deleted listing
+    or order item) and must be recomputed on the next incremental refresh.
+    """
+    animal_type = models.CharField(max_length=50, choices=Animal.AnimalTypes.choices)
+    breed = models.CharField(max_length=100)
+    week = models.DateField()
+
+    class Meta:
+        unique_together = ('animal_type', 'breed', 'week')
+
+
+class ArchivedOrder(models.Model):
+    """
+    Finished (delivered or rejected) orders moved out of the hot Order table
+    by `manage.py archive_orders`. Ids are preserved, so an order keeps its id
+    once archived.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_orders')
+    status = models.CharField(max_length=20, choices=Order.OrderStatus.choices)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['buyer', 'created_at'], name='archorder_buyer_created_idx'),
+            models.Index(fields=['created_at'], name='archorder_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived order {self.id} by {self.buyer.username} - {self.get_status_display()}"
+
+
+class ArchivedOrderItem(models.Model):
+    """Items of an ArchivedOrder, with their original ids."""
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    animal = models.ForeignKey(Animal, on_delete=models.PROTECT, related_name='archived_order_items')
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.quantity} of {self.animal.name} in archived Order {self.order_id}"
@@ -1,9 +1,49 @@
 
 import requests
 import base64
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from django.conf import settings
-from django.core.cache import cache 
+from django.core.cache import cache
+
+ACCESS_TOKEN_TIMEOUT = 10
+STK_PUSH_TIMEOUT = 15
+# Generous headroom over the per-phase timeouts above: a slot that expires
+# while its request is still running lets one extra request through.
+SLOT_TIMEOUT = 4 * (ACCESS_TOKEN_TIMEOUT + STK_PUSH_TIMEOUT)
+
+
+class MpesaCapacityExceeded(Exception):
+    """Raised when every outbound M-Pesa request slot is already in use."""
+    retry_after = 5
+
+
+@contextmanager
+def outbound_request_slot():
+    """
+    Holds one of MPESA_MAX_CONCURRENT_REQUESTS slots shared by all workers.
+
+    Slots are cache keys claimed with an atomic `add` and expire on their own,
+    so a worker that dies mid-request cannot leak one permanently. `requests`
+    timeouts bound each connect and read rather than a whole request, so a
+    slow exchange can outlive its slot; each claim therefore stores a unique
+    token, and a slot is only released by the claim that still holds it.
+    """
+    token = uuid.uuid4().hex
+    for slot in range(settings.MPESA_MAX_CONCURRENT_REQUESTS):
+        key = f'mpesa_outbound_slot_{slot}'
+        if cache.add(key, token, timeout=SLOT_TIMEOUT):
+            break
+    else:
+        raise MpesaCapacityExceeded()
+
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
 
 def get_mpesa_access_token():
     """
@@ -19,7 +59,7 @@ def get_mpesa_access_token():
         url = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'
 
     try:
-        response = requests.get(url, auth=(settings.MPESA_CONSUMER_KEY, settings.MPESA_CONSUMER_SECRET), timeout=10)
+        response = requests.get(url, auth=(settings.MPESA_CONSUMER_KEY, settings.MPESA_CONSUMER_SECRET), timeout=ACCESS_TOKEN_TIMEOUT)
         response.raise_for_status() 
     except requests.exceptions.RequestException as e:
         print(f"Error getting access token: {e}")
@@ -34,6 +74,15 @@ def get_mpesa_access_token():
         return None
     
 def initiate_stk_push(phone_number, amount, order_id, transaction_desc):
+    """
+    Sends an STK push, holding an outbound slot for the whole exchange.
+    Raises MpesaCapacityExceeded if all slots are busy.
+    """
+    with outbound_request_slot():
+        return _send_stk_push(phone_number, amount, order_id, transaction_desc)
+
+
+def _send_stk_push(phone_number, amount, order_id, transaction_desc):
     access_token = get_mpesa_access_token()
     if not access_token:
         return {'error': 'Could not obtain access token.'}
@@ -70,7 +119,7 @@ def initiate_stk_push(phone_number, amount, order_id, transaction_desc):
     print("---------------------------------")
 
     try:
-        response = requests.post(process_request_url, json=payload, headers=headers, timeout=15)
+        response = requests.post(process_request_url, json=payload, headers=headers, timeout=STK_PUSH_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
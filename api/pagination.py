@@ -0,0 +1,93 @@
+import binascii
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import IntegerField, Q, Value
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class NearestFirstPagination(LimitOffsetPagination):
+    """Pages radius searches so a dense area never serializes every match at once."""
+    default_limit = 50
+    max_limit = 200
+
+
+class MergedHistoryPagination(BasePagination):
+    """
+    Keyset pages over several querysets (e.g. hot and archived orders) merged
+    newest first by `created_at`, then `pk`.
+
+    The merge, ordering and limit run in the database as one UNION ALL of
+    (created_at, pk) rows; only the objects on the requested page are loaded.
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = b64decode(encoded.encode()).decode().rsplit('|', 1)
+            created_at = datetime.fromisoformat(created_at)
+            return (created_at if timezone.is_aware(created_at) else timezone.make_aware(created_at)), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        created_at, pk = row[:2]
+        encoded = b64encode(f'{created_at.isoformat()}|{pk}'.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def paginate_querysets(self, querysets, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        keys = []
+        for source, queryset in enumerate(querysets):
+            queryset = queryset.prefetch_related(None).order_by()
+            if cursor is not None:
+                queryset = queryset.filter(
+                    Q(created_at__lt=cursor[0]) | Q(created_at=cursor[0], pk__lt=cursor[1])
+                )
+            queryset = queryset.annotate(source=Value(source, output_field=IntegerField()))
+            queryset = queryset.values_list('created_at', 'pk', 'source')
+            if connection.features.supports_slicing_ordering_in_compound:
+                # Lets each branch stop after one page using its created_at index.
+                queryset = queryset.order_by('-created_at', '-pk')[:page_size + 1]
+            keys.append(queryset)
+
+        merged = keys[0].union(*keys[1:], all=True) if len(keys) > 1 else keys[0]
+        rows = list(merged.order_by('-created_at', '-pk')[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_row = rows[-1] if has_next else None
+
+        objects = {}
+        for source, queryset in enumerate(querysets):
+            pks = [pk for _, pk, row_source in rows if row_source == source]
+            if pks:
+                objects.update({(source, obj.pk): obj for obj in queryset.order_by().filter(pk__in=pks)})
+        return [objects[(source, pk)] for _, pk, source in rows if (source, pk) in objects]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.encode_cursor(self.next_row) if self.next_row is not None else None,
+            'results': data,
+        })
@@ -1,44 +1,57 @@
 from rest_framework import serializers
-from .models import User, Animal, Order, OrderItem
+from .models import User, Animal, Order, OrderItem, PriceStatistic
 
 
-class UserSerializer(serializers.ModelSerializer):
+class CoordinatesMixin:
+    """Requires `latitude` and `longitude` together, so a user is either locatable or not."""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        latitude = attrs.get('latitude', getattr(self.instance, 'latitude', None))
+        longitude = attrs.get('longitude', getattr(self.instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError("Provide both latitude and longitude, or neither.")
+        return attrs
+
+
+class UserSerializer(CoordinatesMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'user_type', 'phone_number', 'location']
+        fields = ['id', 'username', 'email', 'user_type', 'phone_number', 'location', 'latitude', 'longitude']
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(CoordinatesMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, style={'input_type': 'password'})
 
     class Meta:
         model = User
-        fields = ('username', 'email', 'password', 'user_type', 'phone_number', 'location')
+        fields = ('username', 'email', 'password', 'user_type', 'phone_number', 'location', 'latitude', 'longitude')
 
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
         return user
 
-    class AnimalSerializer(serializers.ModelSerializer):
-        farmer_username = serializers.CharField(source='farmer.username', read_only=True)
-        image = serializers.ImageField(required=False, use_url=True)
+class AnimalSerializer(serializers.ModelSerializer):
+    farmer_username = serializers.CharField(source='farmer.username', read_only=True)
+    image = serializers.ImageField(required=False, use_url=True)
+    distance_km = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Animal
         fields = [
             'id', 'farmer', 'farmer_username', 'name', 'animal_type', 'breed',
             'age', 'price', 'description', 'image', 
-            'is_sold', 'quantity', 'created_at', 'updated_at'
+            'is_sold', 'quantity', 'created_at', 'updated_at', 'distance_km'
         ]
         read_only_fields = ['farmer', 'is_sold']
 
-        def to_representation(self, instance):
-       
-            if instance.image and hasattr(instance.image, 'url'):
-                    representation['image'] = instance.image.url
-            else:
-                representation['image'] = None
-            return representation
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        if instance.image and hasattr(instance.image, 'url'):
+            representation['image'] = instance.image.url
+        else:
+            representation['image'] = None
+        return representation
 
 class OrderItemReadSerializer(serializers.ModelSerializer): 
     name = serializers.CharField(source='animal.name', read_only=True)
@@ -81,7 +94,7 @@ class OrderWriteSerializer(serializers.ModelSerializer):
         order = Order.objects.create(**validated_data)
 
         for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+            OrderItem.objects.create(order=order, unit_price=item_data['animal'].price, **item_data)
 
         return order
     
@@ -90,6 +103,13 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['status']
-           
 
-  
\ No newline at end of file
+
+class PriceStatisticSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceStatistic
+        fields = [
+            'animal_type', 'breed', 'week',
+            'listing_count', 'listing_min', 'listing_median', 'listing_p90',
+            'sold_count', 'sold_min', 'sold_median', 'sold_p90', 'refreshed_at'
+        ]
@@ -0,0 +1,70 @@
+"""
+Marks price statistic buckets dirty when rows leave them.
+
+Incremental refreshes find new and updated rows by timestamp, but a listing
+whose type or breed changed, or a deleted listing or order item, leaves its
+old bucket behind; these receivers record that bucket so it gets recomputed.
+"""
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from .market import mark_buckets_dirty, tracking_suspended, week_of
+from .models import Animal, ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+def _sold_buckets(animal, items):
+    return [(animal.animal_type, animal.breed, week_of(created_at)) for created_at in items]
+
+
+@receiver(pre_save, sender=Animal)
+def animal_bucket_changed(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or tracking_suspended():
+        return
+    previous = Animal.objects.filter(pk=instance.pk).only('animal_type', 'breed', 'created_at').first()
+    if previous is None or (previous.animal_type, previous.breed) == (instance.animal_type, instance.breed):
+        return
+    order_dates = set(
+        OrderItem.objects.filter(animal_id=instance.pk).values_list('order__created_at', flat=True)
+    ) | set(
+        ArchivedOrderItem.objects.filter(animal_id=instance.pk).values_list('order__created_at', flat=True)
+    )
+    mark_buckets_dirty(
+        [(previous.animal_type, previous.breed, week_of(previous.created_at))] + _sold_buckets(previous, order_dates)
+    )
+
+
+@receiver(post_delete, sender=Animal)
+def animal_deleted(sender, instance, **kwargs):
+    if tracking_suspended():
+        return
+    mark_buckets_dirty([(instance.animal_type, instance.breed, week_of(instance.created_at))])
+
+
+@receiver(pre_save, sender=OrderItem)
+def order_item_animal_changed(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or tracking_suspended():
+        return
+    previous = OrderItem.objects.filter(pk=instance.pk).select_related('animal', 'order').first()
+    if previous is not None and previous.animal_id != instance.animal_id:
+        mark_buckets_dirty(_sold_buckets(previous.animal, [previous.order.created_at]))
+
+
+def _deleted_item_buckets(instance, order_model):
+    # Deletes cascading from an order remove the items first, so the order row
+    # is still there to read its date from.
+    created_at = order_model.objects.filter(pk=instance.order_id).values_list('created_at', flat=True).first()
+    animal = Animal.objects.filter(pk=instance.animal_id).only('animal_type', 'breed').first()
+    if created_at is not None and animal is not None:
+        mark_buckets_dirty(_sold_buckets(animal, [created_at]))
+
+
+@receiver(post_delete, sender=OrderItem)
+def order_item_deleted(sender, instance, **kwargs):
+    if not tracking_suspended():
+        _deleted_item_buckets(instance, Order)
+
+
+@receiver(post_delete, sender=ArchivedOrderItem)
+def archived_order_item_deleted(sender, instance, **kwargs):
+    if not tracking_suspended():
+        _deleted_item_buckets(instance, ArchivedOrder)
@@ -0,0 +1,128 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .market import refresh_price_statistics, week_of
+from .models import Animal, ArchivedOrder, Order, OrderItem, PriceStatistic, User
+from .throttling import TokenBucketThrottle
+
+
+class PriceStatisticRefreshTests(TestCase):
+    def setUp(self):
+        farmer = User.objects.create(username='farmer', user_type=User.Types.FARMER, location='Nakuru')
+        buyer = User.objects.create(username='buyer', location='Nairobi')
+        self.animal = Animal.objects.create(
+            farmer=farmer, name='Goat', animal_type=Animal.AnimalTypes.GOAT, breed='galla',
+            age=12, price=100, description='', quantity=10,
+        )
+        self.order = Order.objects.create(buyer=buyer, status=Order.OrderStatus.PAID)
+        self.item = OrderItem.objects.create(order=self.order, animal=self.animal, quantity=3, unit_price=100)
+        self.week = week_of(self.order.created_at)
+        refresh_price_statistics(full=True)
+
+    def statistic(self, breed):
+        return PriceStatistic.objects.filter(animal_type=Animal.AnimalTypes.GOAT, breed=breed, week=self.week).first()
+
+    def test_sold_prices_are_per_unit_order_prices(self):
+        self.animal.price = 500
+        self.animal.save()
+        refresh_price_statistics()
+        statistic = self.statistic('galla')
+        self.assertEqual(statistic.sold_count, 3)
+        self.assertEqual(statistic.sold_median, 100)
+        self.assertEqual(statistic.listing_median, 500)
+
+    def test_breed_edit_rebuckets_old_week(self):
+        self.animal.breed = 'dorper'
+        self.animal.save()
+        refresh_price_statistics()
+        self.assertIsNone(self.statistic('galla'))
+        self.assertEqual(self.statistic('dorper').sold_count, 3)
+
+    def test_deleted_item_recomputes_its_bucket(self):
+        self.item.delete()
+        refresh_price_statistics()
+        statistic = self.statistic('galla')
+        self.assertEqual(statistic.sold_count, 0)
+        self.assertEqual(statistic.listing_count, 1)
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        rates = mock.patch.dict(TokenBucketThrottle.THROTTLE_RATES, {'login': '3/min'})
+        rates.start()
+        self.addCleanup(rates.stop)
+
+    def login(self):
+        return self.client.post('/api/auth/jwt/create/', {'username': 'nobody', 'password': 'wrong'})
+
+    def test_denies_request_after_burst_with_retry_after(self):
+        with mock.patch.object(TokenBucketThrottle, 'timer', return_value=1000.0):
+            for _ in range(3):
+                self.assertEqual(self.login().status_code, 401)
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        # One token refills every 20 seconds.
+        self.assertEqual(response['Retry-After'], '20')
+
+    def test_refills_one_token_per_interval(self):
+        with mock.patch.object(TokenBucketThrottle, 'timer', return_value=1000.0):
+            for _ in range(3):
+                self.login()
+        with mock.patch.object(TokenBucketThrottle, 'timer', return_value=1020.0):
+            self.assertEqual(self.login().status_code, 401)
+            self.assertEqual(self.login().status_code, 429)
+
+    def test_buckets_are_per_client_ip(self):
+        with mock.patch.object(TokenBucketThrottle, 'timer', return_value=1000.0):
+            for _ in range(4):
+                self.login()
+            other = APIClient(REMOTE_ADDR='10.0.0.2')
+            response = other.post('/api/auth/jwt/create/', {'username': 'nobody', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+
+
+class MergedHistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.buyer = User.objects.create(username='buyer', location='Nairobi')
+        other = User.objects.create(username='other', location='Nairobi')
+        start = timezone.now() - timedelta(days=30)
+        self.expected = []
+        for day in range(7):
+            created_at = start + timedelta(days=day)
+            order = Order.objects.create(buyer=self.buyer)
+            Order.objects.filter(pk=order.pk).update(created_at=created_at)
+            # Archived orders keep their hot-table ids; odd days tie on created_at.
+            archived_at = created_at if day % 2 else created_at - timedelta(hours=1)
+            archived_id = Order.objects.create(buyer=self.buyer).pk
+            Order.objects.filter(pk=archived_id).delete()
+            ArchivedOrder.objects.create(
+                id=archived_id, buyer=self.buyer, status=Order.OrderStatus.DELIVERED,
+                created_at=archived_at, updated_at=archived_at,
+            )
+            self.expected += [(created_at, order.pk), (archived_at, archived_id)]
+        Order.objects.create(buyer=other)
+        self.expected = [pk for _, pk in sorted(self.expected, reverse=True)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def test_pages_cover_hot_and_archived_orders_once_newest_first(self):
+        seen = []
+        url = '/api/orders/?include_archived=true&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen += [order['id'] for order in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/api/orders/?include_archived=true&cursor=bm90LWEtY3Vyc29y')
+        self.assertEqual(response.status_code, 404)
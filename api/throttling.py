@@ -0,0 +1,99 @@
+import time
+import uuid
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token-bucket variant of DRF's scoped throttle.
+
+    Rates use the usual `REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']` format; a
+    rate of '5/min' means a burst of 5 requests, refilled at one token every
+    12 seconds. Buckets live in the default cache so every worker shares them.
+
+    Each bucket is a single cache entry of (tokens, last update time), read and
+    written under a short lock taken with `cache.add`, which is atomic on Redis
+    and the database cache, so concurrent requests can never spend the same
+    token twice. A request that cannot take the lock within `lock_wait`
+    seconds is refused rather than queued.
+    """
+    scope_attr = 'throttle_scope'
+    lock_timeout = 2
+    lock_wait = 0.5
+    lock_poll = 0.005
+
+    def __init__(self):
+        # The scope comes from the view, so rate parsing is deferred to allow_request.
+        pass
+
+    def get_scope(self, view):
+        return getattr(view, self.scope_attr, None)
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        interval = self.duration / self.num_requests
+        lock_key = f'{self.key}_lock'
+        token = uuid.uuid4().hex
+        deadline = self.timer() + self.lock_wait
+        while not self.cache.add(lock_key, token, self.lock_timeout):
+            if self.timer() >= deadline:
+                self.wait_seconds = interval
+                return False
+            time.sleep(self.lock_poll)
+
+        try:
+            now = self.timer()
+            tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+            tokens = min(self.num_requests, tokens + (now - updated) / interval)
+            if tokens >= 1:
+                # An idle bucket refills completely within `duration`, so it can expire then.
+                self.cache.set(self.key, (tokens - 1, now), self.duration)
+                return True
+            self.wait_seconds = (1 - tokens) * interval
+            return False
+        finally:
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Buckets per endpoint scope and user, falling back to the client IP for anonymous requests."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = f'user_{request.user.pk}'
+        else:
+            ident = f'ip_{self.get_ident(request)}'
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Buckets per endpoint scope and client IP, regardless of authentication.
+
+    A view's `ip_throttle_scope`, if set, replaces its `throttle_scope` here,
+    so per-IP limits can be looser than per-user ones: many mobile users share
+    one carrier NAT address.
+    """
+    cache_format = 'throttle_ip_%(scope)s_%(ident)s'
+
+    def get_scope(self, view):
+        return getattr(view, 'ip_throttle_scope', None) or super().get_scope(view)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -8,9 +8,10 @@ from .views import (
     UserProfileView,
     RegisterUserView,
     FarmerProfessionalDashboardView, 
+    MarketPriceTrendView,
 )
 
-
+router = DefaultRouter()
 router.register(r'animals', AnimalViewSet, basename='animal')
 router.register(r'orders', OrderViewSet, basename='order')
 
@@ -19,6 +20,7 @@ urlpatterns = [
     path('register/', RegisterUserView.as_view(), name='register-user'),
     path('users/me/', UserProfileView.as_view(), name='user-profile'),
     path('dashboard/pro-stats/', FarmerProfessionalDashboardView.as_view(), name='farmer-pro-stats'),
+    path('market/prices/', MarketPriceTrendView.as_view(), name='market-prices'),
     path('make-payment/', MakePaymentView.as_view(), name='make-payment'),
     path('mpesa-callback/', MpesaCallbackView.as_view(), name='mpesa-callback'),
 ]
\ No newline at end of file
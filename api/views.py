@@ -2,27 +2,32 @@ from rest_framework import viewsets, permissions, status, generics
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework_simplejwt.views import TokenObtainPairView
+from djoser import views as djoser_views
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.http import Http404
 from rest_framework import serializers 
 from django.db.models import Sum, F, Count
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models.functions import TruncDate
 
-from . import mpesa_api
-from .models import Animal, Order, OrderItem, User
+from . import geo, mpesa_api
+from .docs import swagger_schema
+from .models import Animal, ArchivedOrder, Order, OrderItem, PriceStatistic, User
 from .serializers import (
     AnimalSerializer,
     OrderReadSerializer,
     OrderWriteSerializer,
     OrderStatusUpdateSerializer,  # Crucial import
+    PriceStatisticSerializer,
     UserSerializer,
     UserRegistrationSerializer
 )
+from .pagination import MergedHistoryPagination, NearestFirstPagination
 from .permissions import IsFarmerOrReadOnly, IsOrderFarmerOrBuyerOrAdmin
+from .throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
 
 
 
@@ -30,10 +35,28 @@ class RegisterUserView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'register'
+
+class ThrottledUserViewSet(djoser_views.UserViewSet):
+    """Djoser's user endpoints, with sign-up (`POST /api/auth/users/`) sharing the register throttle."""
+    throttle_scope = 'register'
+
+    def get_throttles(self):
+        if self.action == 'create':
+            return [IPTokenBucketThrottle()]
+        return super().get_throttles()
+
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """JWT login; throttled because every attempt pays for a password hash."""
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'login'
+
 
 class UserProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
-    @swagger_auto_schema(operation_description="Get profile of logged-in user.", responses={200: UserSerializer()})
+    @swagger_schema(lambda openapi: dict(operation_description="Get profile of logged-in user.", responses={200: UserSerializer()}))
     def get(self, request):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
@@ -45,6 +68,39 @@ class AnimalViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsFarmerOrReadOnly]
     parser_classes = (MultiPartParser, FormParser)
 
+    @property
+    def paginator(self):
+        """Radius searches are paged (limit/offset); the plain listing keeps its existing shape."""
+        if not hasattr(self, '_paginator'):
+            nearby = self.action == 'list' and 'radius_km' in self.request.query_params
+            self._paginator = NearestFirstPagination() if nearby else None
+        return self._paginator
+
+    def get_queryset(self):
+        """
+        Optionally restricts listings to farmers within `radius_km` of `lat`/`lng`,
+        nearest first. The point defaults to the requesting user's coordinates.
+        """
+        queryset = super().get_queryset().select_related('farmer')
+        if getattr(self, 'swagger_fake_view', False) or self.action != 'list':
+            return queryset
+        radius_km = self.request.query_params.get('radius_km')
+        if radius_km is None:
+            return queryset
+
+        latitude = self.request.query_params.get('lat', getattr(self.request.user, 'latitude', None))
+        longitude = self.request.query_params.get('lng', getattr(self.request.user, 'longitude', None))
+        try:
+            latitude, longitude, radius_km = float(latitude), float(longitude), float(radius_km)
+        except (TypeError, ValueError):
+            raise serializers.ValidationError("'lat', 'lng' and 'radius_km' must be numbers.")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius_km <= 0:
+            raise serializers.ValidationError("Coordinates or radius out of range.")
+        if radius_km > geo.MAX_SEARCH_RADIUS_KM:
+            raise serializers.ValidationError(f"'radius_km' may not exceed {geo.MAX_SEARCH_RADIUS_KM}.")
+
+        return geo.filter_within_radius(queryset, latitude, longitude, radius_km, prefix='farmer__')
+
     def perform_create(self, serializer):
         serializer.save(farmer=self.request.user)
 
@@ -62,15 +118,47 @@ class OrderViewSet(viewsets.ModelViewSet):
         return OrderReadSerializer
 
     def get_queryset(self):
-        
+        if getattr(self, 'swagger_fake_view', False):
+            return Order.objects.none()
+        return self._visible_orders(Order.objects.all())
+
+    def _visible_orders(self, queryset):
+        """Scopes an Order or ArchivedOrder queryset to what the requesting user may see."""
         user = self.request.user
-        queryset = Order.objects.select_related('buyer').prefetch_related('items__animal').all()
+        queryset = queryset.select_related('buyer').prefetch_related('items__animal')
         if user.is_staff:
             return queryset.order_by('-created_at')
         if user.user_type == User.Types.FARMER:
             return queryset.filter(items__animal__farmer=user).distinct().order_by('-created_at')
         return queryset.filter(buyer=user).order_by('-created_at')
 
+    def _include_archived(self):
+        """
+        Archived (old delivered/rejected) orders are only read when
+        `?include_archived=true`; that listing is cursor-paginated.
+        """
+        return self.request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+    def list(self, request, *args, **kwargs):
+        if not self._include_archived():
+            return super().list(request, *args, **kwargs)
+        paginator = MergedHistoryPagination()
+        orders = paginator.paginate_querysets([
+            self.filter_queryset(self.get_queryset()),
+            self.filter_queryset(self._visible_orders(ArchivedOrder.objects.all())),
+        ], request)
+        return paginator.get_paginated_response(self.get_serializer(orders, many=True).data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != 'retrieve' or not self._include_archived():
+                raise
+        order = generics.get_object_or_404(self._visible_orders(ArchivedOrder.objects.all()), pk=self.kwargs['pk'])
+        self.check_object_permissions(self.request, order)
+        return order
+
     
     def perform_create(self, serializer):
 
@@ -86,15 +174,20 @@ class OrderViewSet(viewsets.ModelViewSet):
                     animal_to_update.quantity -= item.quantity
                     if animal_to_update.quantity == 0:
                         animal_to_update.is_sold = True
-                    animal_to_update.save()
+                    # Stock changes are not listing edits, so `updated_at` (which
+                    # drives incremental price statistics) is left alone.
+                    animal_to_update.save(update_fields=['quantity', 'is_sold'])
         except Exception as e:
             print(f"Order creation failed: {e}")
             raise serializers.ValidationError("Could not create order due to a stock issue or server error.")
 
 class MakePaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle]
+    throttle_scope = 'payment'
+    ip_throttle_scope = 'payment_ip'
 
-    @swagger_auto_schema(
+    @swagger_schema(lambda openapi: dict(
         operation_description="Initiate M-Pesa STK Push for a specific order.",
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
@@ -105,7 +198,7 @@ class MakePaymentView(APIView):
             },
         ),
         responses={200: openapi.Response("STK push initiated")}
-    )
+    ))
     def post(self, request, *args, **kwargs):
         order_id = request.data.get('order_id')
         phone_number = request.data.get('phone_number')
@@ -127,12 +220,19 @@ class MakePaymentView(APIView):
 
         print(f"Generated Transaction Description: '{transaction_desc}'")
 
-        response_data = mpesa_api.initiate_stk_push(
-            phone_number=phone_number,
-            amount=int(amount),
-            order_id=order_id,
-            transaction_desc=transaction_desc
-        )
+        try:
+            response_data = mpesa_api.initiate_stk_push(
+                phone_number=phone_number,
+                amount=int(amount),
+                order_id=order_id,
+                transaction_desc=transaction_desc
+            )
+        except mpesa_api.MpesaCapacityExceeded as e:
+            return Response(
+                {'error': 'Payment service is busy, please retry shortly.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(e.retry_after)}
+            )
 
         if 'errorCode' in response_data:
             return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
@@ -141,9 +241,9 @@ class MakePaymentView(APIView):
 
 class MpesaCallbackView(APIView):
     permission_classes = [permissions.AllowAny]
-    @swagger_auto_schema(
-       
-    )
+    throttle_classes = [IPTokenBucketThrottle]
+    throttle_scope = 'mpesa_callback'
+    @swagger_schema()
     def post(self, request, *args, **kwargs):
        
         order_id = request.data.get('order_id')
@@ -216,4 +316,40 @@ class FarmerProfessionalDashboardView(APIView):
             'sales_over_time': sales_over_time_data,
         }
 
-        return Response(dashboard_data)
\ No newline at end of file
+        return Response(dashboard_data)
+
+
+class MarketPriceTrendView(APIView):
+    """Serves precomputed weekly price statistics (see `manage.py refresh_price_statistics`)."""
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_WEEKS = 52
+
+    @swagger_schema(lambda openapi: dict(
+        operation_description="Weekly listing and sold price statistics for an animal type, optionally narrowed to a breed.",
+        manual_parameters=[
+            openapi.Parameter('animal_type', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('breed', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+            openapi.Parameter('weeks', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Defaults to 12, at most 52'),
+        ],
+        responses={200: PriceStatisticSerializer(many=True)}
+    ))
+    def get(self, request, *args, **kwargs):
+        animal_type = request.query_params.get('animal_type')
+        if animal_type not in Animal.AnimalTypes.values:
+            return Response({'error': 'A valid animal_type is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            weeks = int(request.query_params.get('weeks', 12))
+        except ValueError:
+            weeks = 0
+        if weeks < 1:
+            return Response({'error': 'weeks must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        weeks = min(weeks, self.MAX_WEEKS)
+
+        since = timezone.now().date() - timedelta(weeks=weeks)
+        statistics = PriceStatistic.objects.filter(animal_type=animal_type, week__gte=since)
+        breed = request.query_params.get('breed')
+        if breed:
+            statistics = statistics.filter(breed=breed)
+
+        serializer = PriceStatisticSerializer(statistics.order_by('-week', 'breed')[:self.MAX_WEEKS * 20], many=True)
+        return Response(serializer.data)
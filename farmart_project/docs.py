@@ -0,0 +1,144 @@
+"""
+API documentation views.
+
+drf_yasg is only imported when the schema is generated (at build time, or on
+the first /openapi.json hit without a prebuilt file), so it stays out of
+worker boot. The schema is built once, kept in memory as raw and gzipped
+bytes, and served as a static artifact. The Swagger UI and ReDoc pages are
+plain HTML that fetch /openapi.json in the browser; they never run drf_yasg's
+schema views, which would regenerate the schema for every uncached visitor.
+"""
+import gzip
+import hashlib
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+SCHEMA_FILE = settings.BASE_DIR / 'openapi' / 'openapi.json'
+
+SWAGGER_UI_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8"/>
+<title>Farmart API</title>
+<link rel="icon" type="image/png" href="{favicon}"/>
+<link rel="stylesheet" type="text/css" href="{css}"/>
+</head>
+<body>
+<div id="swagger-ui"></div>
+<script src="{bundle}"></script>
+<script src="{preset}"></script>
+<script>
+window.ui = SwaggerUIBundle({{
+    url: "{schema_url}",
+    dom_id: "#swagger-ui",
+    presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset],
+    layout: "StandaloneLayout"
+}});
+</script>
+</body>
+</html>
+"""
+
+REDOC_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8"/>
+<title>Farmart API</title>
+</head>
+<body>
+<redoc spec-url="{schema_url}"></redoc>
+<script src="{bundle}"></script>
+</body>
+</html>
+"""
+
+_lock = threading.Lock()
+_schema = None
+_pages = {}
+
+
+def _info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Farmart API",
+        default_version='v1',
+        description="API for the Farmart livestock marketplace.",
+    )
+
+
+def generate_schema():
+    """Introspects every endpoint and returns the OpenAPI document as JSON bytes."""
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    from api import docs
+
+    docs.apply_schemas()
+    schema = OpenAPISchemaGenerator(info=_info()).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def _load_schema():
+    global _schema
+    if _schema is None:
+        with _lock:
+            if _schema is None:
+                if SCHEMA_FILE.exists():
+                    raw = SCHEMA_FILE.read_bytes()
+                else:
+                    raw = generate_schema()
+                _schema = (raw, gzip.compress(raw), '"%s"' % hashlib.md5(raw).hexdigest())
+    return _schema
+
+
+def openapi_schema(request):
+    raw, compressed, etag = _load_schema()
+    if request.headers.get('If-None-Match') == etag:
+        return HttpResponseNotModified()
+
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(compressed, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(raw, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=3600'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _render_page(name):
+    schema_url = reverse('schema-json')
+    if name == 'swagger':
+        return SWAGGER_UI_PAGE.format(
+            favicon=static('drf-yasg/swagger-ui-dist/favicon-32x32.png'),
+            css=static('drf-yasg/swagger-ui-dist/swagger-ui.css'),
+            bundle=static('drf-yasg/swagger-ui-dist/swagger-ui-bundle.js'),
+            preset=static('drf-yasg/swagger-ui-dist/swagger-ui-standalone-preset.js'),
+            schema_url=schema_url,
+        )
+    return REDOC_PAGE.format(bundle=static('drf-yasg/redoc/redoc.min.js'), schema_url=schema_url)
+
+
+def _page(name):
+    if name not in _pages:
+        with _lock:
+            if name not in _pages:
+                _pages[name] = _render_page(name).encode()
+    response = HttpResponse(_pages[name], content_type='text/html; charset=utf-8')
+    response['Cache-Control'] = f'public, max-age={settings.API_DOCS_CACHE_TIMEOUT}'
+    return response
+
+
+def swagger_ui(request):
+    return _page('swagger')
+
+
+def redoc_ui(request):
+    return _page('redoc')
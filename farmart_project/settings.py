@@ -27,7 +27,6 @@ INSTALLED_APPS = [
     'djoser',
     'cloudinary',
     'cloudinary_storage',
-    'drf_yasg'
 
     'api',
     'drf_yasg',
@@ -104,6 +103,25 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Throttle buckets and M-Pesa request slots must be shared by every worker,
+# so the per-process local-memory cache is not an option in production.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_cache',
+        }
+    }
+
+
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -111,7 +129,17 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # Render's load balancer appends the client address to X-Forwarded-For;
+    # only that trusted hop identifies the client for IP throttles.
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
+    'DEFAULT_THROTTLE_RATES': {
+        'register': config('THROTTLE_RATE_REGISTER', default='10/hour'),
+        'login': config('THROTTLE_RATE_LOGIN', default='10/min'),
+        'payment': config('THROTTLE_RATE_PAYMENT', default='5/min'),
+        'payment_ip': config('THROTTLE_RATE_PAYMENT_IP', default='60/min'),
+        'mpesa_callback': config('THROTTLE_RATE_MPESA_CALLBACK', default='300/min'),
+    },
 }
 
 
@@ -139,6 +167,11 @@ DJOSER = {
 CORS_ALLOW_ALL_ORIGINS = True 
 
 
+# Browser cache lifetime of the static Swagger UI and ReDoc pages (see
+# farmart_project/docs.py); both load the prebuilt /openapi.json.
+API_DOCS_CACHE_TIMEOUT = 60 * 60
+
+
 
 MPESA_ENVIRONMENT = config('MPESA_ENVIRONMENT')
 MPESA_CONSUMER_KEY = config('MPESA_CONSUMER_KEY')
@@ -146,4 +179,5 @@ MPESA_CONSUMER_SECRET = config('MPESA_CONSUMER_SECRET')
 MPESA_SHORTCODE = config('MPESA_SHORTCODE')
 MPESA_PASSKEY = config('MPESA_PASSKEY')
 MPESA_TRANSACTION_TYPE = 'CustomerPayBillOnline'
+MPESA_MAX_CONCURRENT_REQUESTS = config('MPESA_MAX_CONCURRENT_REQUESTS', default=8, cast=int)
 MPESA_CALLBACK_URL = f"{config('BACKEND_DOMAIN')}/api/mpesa-callback/"
\ No newline at end of file
@@ -1,18 +1,23 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from api.views import ThrottledTokenObtainPairView, ThrottledUserViewSet
+
+from . import docs
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    # Throttled overrides of Djoser's sign-up and JWT login; must precede the includes.
+    path('api/auth/users/', ThrottledUserViewSet.as_view({'get': 'list', 'post': 'create'}), name='user-list'),
+    re_path(r'^api/auth/jwt/create/?$', ThrottledTokenObtainPairView.as_view(), name='jwt-create'),
     path('api/auth/', include('djoser.urls')),
     path('api/auth/', include('djoser.urls.jwt')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-
+    path('openapi.json', docs.openapi_schema, name='schema-json'),
+    path('swagger/', docs.swagger_ui, name='schema-swagger-ui'),
+    path('redoc/', docs.redoc_ui, name='schema-redoc'),
 ]
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)